@@ -11,14 +11,20 @@ Usage:
     python court-scraper/scrape_courts.py
 """
 
-import json
+import asyncio
+import gzip
+import multiprocessing
 import os
+import re
 import sys
-import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 from pathlib import Path
 
-import requests
+import httpx
+import orjson
 from dotenv import load_dotenv
+from PIL import Image
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(REPO_ROOT / ".env")
@@ -79,55 +85,113 @@ SEARCH_TEMPLATES = [
     "pickleball club near {}",
 ]
 
+# Every city × template query, deduplicated in order (a repeated city would cost a full search)
+ALL_QUERIES = tuple(dict.fromkeys(t.format(c.strip()) for c in CITIES for t in SEARCH_TEMPLATES))
+
 TEXT_SEARCH_FIELDS = "places.id,places.displayName,places.location,places.formattedAddress,places.types"
 DETAILS_FIELDS = "rating,userRatingCount,regularOpeningHours,internationalPhoneNumber,websiteUri,photos"
 
 MAX_NEW_ENRICHMENT = 300  # Conservative — leaves buffer under 1,000/month limit
 
+# A search hit needs at least one of these types to be worth a Details call
+# (filters out pro shops, coaching services, associations — see README "Data Filtering")
+COURT_TYPES = frozenset({
+    "athletic_field", "community_center", "event_venue", "fitness_center", "gym", "park",
+    "playground", "sports_activity_location", "sports_club", "sports_complex", "stadium", "tennis_court",
+})
+# ...or a name that says it's a venue, for courts Google files under schools, clubs, etc.
+# Whole words only, so names like "Courtyard Marriott" or "Courthouse Cafe" don't slip through
+COURT_NAME_RE = re.compile(r"\b(courts?|club)\b", re.IGNORECASE)
+
+# HTTP/2 multiplexes every in-flight Places call over one connection; the rest cover the photo host
+MAX_CONNECTIONS = 4
+# Sent only on Places API calls, which never follow redirects: httpx forwards custom headers
+# like this one across a redirect (it strips only Authorization)
+AUTH_HEADERS = {"X-Goog-Api-Key": API_KEY}
+REQUEST_ERRORS = (httpx.HTTPError, orjson.JSONDecodeError)  # Failed call, or a malformed body
+
+# Caps on concurrent requests per endpoint (separate quotas), keeps us under the QPS limits
+SEARCH_SEM = asyncio.Semaphore(8)
+DETAILS_SEM = asyncio.Semaphore(12)
+PHOTO_SEM = asyncio.Semaphore(16)
+
+# Throttling, transient server errors and dropped connections are retried with
+# exponential back-off (1s, 2s, 4s, ...)
+MAX_RETRIES = 5
+MAX_RETRY_AFTER = 60  # Seconds — cap on a server-requested wait
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def retry_delay(resp, attempt):
+    """Seconds to wait before a retry: the server's Retry-After if given, else exponential."""
+    retry_after = resp.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), MAX_RETRY_AFTER)
+        except ValueError:
+            pass  # HTTP-date form — fall back to our own schedule
+    return 2.0 ** attempt
+
+
+async def send(client, sem, method, url, **kwargs):
+    """Send a Places request under sem, retrying throttled and failed attempts. Returns the body."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with sem:
+                resp = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            # Connect/read timeouts, resets, HTTP/2 GOAWAY
+            if attempt == MAX_RETRIES:
+                raise
+            delay = 2.0 ** attempt
+            print(f"  {type(e).__name__} from Places API, retrying in {delay:g}s...")
+        else:
+            if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                resp.raise_for_status()
+                return resp.content
+            delay = retry_delay(resp, attempt)
+            print(f"  HTTP {resp.status_code} from Places API, retrying in {delay:g}s...")
+        # Back off outside the semaphore so a throttled call doesn't hold a slot
+        await asyncio.sleep(delay)
 
-def text_search(query, page_token=None):
+
+async def text_search(client, query, page_token=None):
     headers = {
+        **AUTH_HEADERS,
         "Content-Type": "application/json",
-        "X-Goog-Api-Key": API_KEY,
         "X-Goog-FieldMask": f"nextPageToken,{TEXT_SEARCH_FIELDS}",
     }
     body = {"textQuery": query, "pageSize": 20}
     if page_token:
         body["pageToken"] = page_token
 
-    resp = requests.post(TEXT_SEARCH_URL, headers=headers, json=body, timeout=30)
-    if resp.status_code == 429:
-        print("  Rate limited, sleeping 5s...")
-        time.sleep(5)
-        resp = requests.post(TEXT_SEARCH_URL, headers=headers, json=body, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    return orjson.loads(await send(client, SEARCH_SEM, "POST", TEXT_SEARCH_URL, headers=headers, json=body))
 
 
-def get_place_details(place_id):
+async def get_place_details(client, place_id):
     url = PLACE_DETAILS_URL.format(place_id=place_id)
-    headers = {
-        "X-Goog-Api-Key": API_KEY,
-        "X-Goog-FieldMask": DETAILS_FIELDS,
-    }
-    resp = requests.get(url, headers=headers, timeout=30)
-    if resp.status_code == 429:
-        print("  Rate limited, sleeping 5s...")
-        time.sleep(5)
-        resp = requests.get(url, headers=headers, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    headers = {**AUTH_HEADERS, "X-Goog-FieldMask": DETAILS_FIELDS}
+    return orjson.loads(await send(client, DETAILS_SEM, "GET", url, headers=headers))
+
 
+def encode_webp(data, save_path):
+    """Re-encode a downloaded photo as WebP (runs in a worker process — codec work is CPU-bound)."""
+    tmp_path = save_path.with_name(save_path.name + ".tmp")
+    try:
+        with Image.open(BytesIO(data)) as img:
+            img.save(tmp_path, "WEBP", quality=80)
+        os.replace(tmp_path, save_path)  # A failed encode never leaves a partial photo behind
+    finally:
+        tmp_path.unlink(missing_ok=True)
 
-def download_photo(photo_name, save_path):
+
+async def download_photo(client, photo_name, save_path, pool):
     url = PHOTO_URL.format(photo_name=photo_name)
-    params = {"maxHeightPx": 300, "maxWidthPx": 400, "key": API_KEY}
-    resp = requests.get(url, params=params, timeout=30)
-    if resp.status_code == 429:
-        time.sleep(5)
-        resp = requests.get(url, params=params, timeout=30)
-    resp.raise_for_status()
-    save_path.write_bytes(resp.content)
+    # Ask for the image URL rather than a redirect, then fetch it without credentials
+    params = {"maxHeightPx": 300, "maxWidthPx": 400, "skipHttpRedirect": "true"}
+    media = orjson.loads(await send(client, PHOTO_SEM, "GET", url, headers=AUTH_HEADERS, params=params))
+    data = await send(client, PHOTO_SEM, "GET", media["photoUri"], follow_redirects=True)
+    await asyncio.get_running_loop().run_in_executor(pool, encode_webp, data, save_path)
 
 
 def parse_hours(opening_hours):
@@ -135,44 +199,95 @@ def parse_hours(opening_hours):
         return None
     hours = {}
     for desc in opening_hours["weekdayDescriptions"]:
-        parts = desc.split(": ", 1)
-        if len(parts) == 2:
-            hours[parts[0].lower()] = parts[1]
+        day, sep, times = desc.partition(": ")
+        if sep:
+            hours[day.lower()] = times
     return hours
 
 
 def load_state():
-    """Load searched queries and existing court data."""
+    """Load searched queries, existing court data, and the set of enriched place ids."""
     data_dir = REPO_ROOT / "data"
 
     # Load searched queries from checkpoint
     checkpoint_path = data_dir / "raw_places.json"
     searched_queries = []
+    enriched_pids = None
     if checkpoint_path.exists():
-        with open(checkpoint_path) as f:
-            data = json.load(f)
+        data = orjson.loads(checkpoint_path.read_bytes())
         if isinstance(data, dict) and "searched_queries" in data:
             searched_queries = data["searched_queries"]
+            if "enriched_place_ids" in data:
+                enriched_pids = set(data["enriched_place_ids"])
         else:
             # Old format — assume original 25 cities were searched with one template
-            searched_queries = [f"pickleball courts near {city}" for city in CITIES[:25]]
+            searched_queries = [f"pickleball courts near {city.strip()}" for city in CITIES[:25]]
 
     # Load courts from final output (has enrichment data from previous runs)
     courts = {}
-    courts_path = data_dir / "courts.json"
+    courts_path = data_dir / "courts.jsonl.gz"
+    legacy_path = data_dir / "courts.json"
     if courts_path.exists():
-        with open(courts_path) as f:
-            court_list = json.load(f)
-        for c in court_list:
-            courts[c["place_id"]] = c
+        with gzip.open(courts_path, "rb") as f:
+            courts = {c["place_id"]: c for c in map(orjson.loads, f)}
+    elif legacy_path.exists():
+        # Old format — one indented JSON array, rewritten as courts.jsonl.gz on save
+        courts = {c["place_id"]: c for c in orjson.loads(legacy_path.read_bytes())}
+
+    if enriched_pids is None:
+        # Checkpoint predates the enriched set — rebuild it once from the court data
+        enriched_pids = {pid for pid, c in courts.items() if is_enriched(c)}
+    else:
+        enriched_pids = {pid for pid in enriched_pids if pid in courts}
+
+    # Replay courts enriched by a run that crashed before the final save
+    enriched_path = data_dir / "enriched.jsonl"
+    if enriched_path.exists():
+        resumed = set()
+        with open(enriched_path, "rb") as f:
+            for line in f:
+                try:
+                    c = orjson.loads(line)
+                except ValueError:
+                    continue  # Partial last line from an interrupted write
+                courts[c["place_id"]] = c
+                resumed.add(c["place_id"])
+        enriched_pids |= resumed
+        print(f"Resumed {len(resumed)} enriched courts from {enriched_path}")
+
+    return searched_queries, courts, enriched_pids
+
+
+def save_checkpoint(searched_queries, enriched_pids):
+    checkpoint_path = REPO_ROOT / "data" / "raw_places.json"
+    checkpoint = {"searched_queries": searched_queries, "enriched_place_ids": sorted(enriched_pids)}
+    checkpoint_path.write_bytes(orjson.dumps(checkpoint, option=orjson.OPT_INDENT_2))
 
-    return searched_queries, courts
 
+def save_courts(court_list):
+    """Write the full dataset as gzipped JSONL (one court per line), replacing it atomically."""
+    data_dir = REPO_ROOT / "data"
+    courts_path = data_dir / "courts.jsonl.gz"
+    tmp_path = data_dir / "courts.jsonl.gz.tmp"
+    with gzip.open(tmp_path, "wb") as f:
+        f.writelines(orjson.dumps(c) + b"\n" for c in court_list)
+    os.replace(tmp_path, courts_path)
+    (data_dir / "courts.json").unlink(missing_ok=True)  # Superseded legacy copy
+    return courts_path
 
-def save_checkpoint(searched_queries):
-    checkpoint_path = REPO_ROOT / "data" / "raw_places.json"
-    with open(checkpoint_path, "w") as f:
-        json.dump({"searched_queries": searched_queries}, f, indent=2)
+
+def append_enriched(log, court):
+    """Append one enriched court to the JSONL log so an interrupted run can resume."""
+    log.write(orjson.dumps(court) + b"\n")
+    log.flush()
+
+
+def looks_like_court(court):
+    """Check if a result's search types or name allow it to be a court (no types means unknown, so yes)."""
+    types = court.get("types")
+    if not types or not COURT_TYPES.isdisjoint(types):
+        return True
+    return COURT_NAME_RE.search(court.get("name") or "") is not None
 
 
 def is_enriched(court):
@@ -180,179 +295,295 @@ def is_enriched(court):
     return any(court.get(f) is not None for f in ["rating", "phone", "website", "hours"])
 
 
-def search_new_queries(searched_queries, courts):
+async def page_all(client, query):
+    """Fetch up to 3 pages for one query. Returns (query, pages fetched), pages [] if the first failed."""
+    try:
+        page = await text_search(client, query)
+    except REQUEST_ERRORS as e:
+        print(f"  ERROR searching '{query}': {e}, skipping")
+        return query, []
+
+    pages = [page]
+    while page.get("nextPageToken") and len(pages) < 3:
+        try:
+            page = await text_search(client, query, page_token=page["nextPageToken"])
+        except REQUEST_ERRORS as e:
+            print(f"  ERROR on page {len(pages)} of '{query}': {e}")
+            break
+        pages.append(page)
+    return query, pages
+
+
+def street_view_url(lat, lng):
+    """Street View link for a location (free — just a URL, no API call)."""
+    if not (lat and lng):
+        return None
+    return f"https://www.google.com/maps/@?api=1&map_action=pano&viewpoint={lat},{lng}"
+
+
+def merge_places(courts, places):
+    """Add Text Search results we haven't seen before to courts."""
+    for p in places:
+        pid = p.get("id")
+        if pid and pid not in courts:
+            lat = p.get("location", {}).get("latitude")
+            lng = p.get("location", {}).get("longitude")
+            courts[pid] = {
+                "place_id": pid,
+                "name": p.get("displayName", {}).get("text", "Unknown"),
+                "address": p.get("formattedAddress"),
+                "lat": lat,
+                "lng": lng,
+                "types": p.get("types", []),
+                "rating": None,
+                "user_rating_count": None,
+                "phone": None,
+                "website": None,
+                "hours": None,
+                "photo": None,
+                "street_view_url": street_view_url(lat, lng),
+            }
+
+
+async def search_new_queries(client, searched_queries, courts):
     """Search only queries we haven't run before. Returns updated query list."""
-    searched_set = set(searched_queries)
-    new_queries = []
-    for city in CITIES:
-        for template in SEARCH_TEMPLATES:
-            q = template.format(city)
-            if q not in searched_set:
-                new_queries.append(q)
+    searched_set = frozenset(searched_queries)
+    new_queries = [q for q in ALL_QUERIES if q not in searched_set]
 
     if not new_queries:
         print("All queries already searched. No new Text Search calls needed.")
         return searched_queries
 
     print(f"\n{len(new_queries)} new queries to search...")
+    # First pages all go out together; each query then follows its own page tokens.
+    # Merge and report queries as they finish so progress shows during long searches.
     total_requests = 0
-
-    for query in new_queries:
-        print(f"Searching: {query}")
-        page = 0
-
-        try:
-            result = text_search(query)
-            total_requests += 1
-        except requests.RequestException as e:
-            print(f"  ERROR: {e}, skipping")
+    for task in asyncio.as_completed([page_all(client, q) for q in new_queries]):
+        query, pages = await task
+        if not pages:
             continue
-
-        while True:
-            places = result.get("places", [])
-            for p in places:
-                pid = p.get("id")
-                if pid and pid not in courts:
-                    courts[pid] = {
-                        "place_id": pid,
-                        "name": p.get("displayName", {}).get("text", "Unknown"),
-                        "address": p.get("formattedAddress"),
-                        "lat": p.get("location", {}).get("latitude"),
-                        "lng": p.get("location", {}).get("longitude"),
-                        "types": p.get("types", []),
-                        "rating": None,
-                        "user_rating_count": None,
-                        "phone": None,
-                        "website": None,
-                        "hours": None,
-                        "photo": None,
-                        "street_view_url": None,
-                    }
-
-            page += 1
-            next_token = result.get("nextPageToken")
-            if not next_token or page >= 3:
-                break
-
-            time.sleep(0.5)
-            try:
-                result = text_search(query, page_token=next_token)
-                total_requests += 1
-            except requests.RequestException as e:
-                print(f"  ERROR on page {page}: {e}")
-                break
-
+        for result in pages:
+            merge_places(courts, result.get("places", []))
+        total_requests += len(pages)
         searched_queries.append(query)
-        print(f"  {len(places)} results (page {page}), {len(courts)} unique total")
+        last_count = len(pages[-1].get("places", []))
+        print(f"Searched: {query} — {last_count} results (page {len(pages)}), {len(courts)} unique total")
 
     print(f"\nSearch phase complete: {len(courts)} unique courts, {total_requests} new API calls")
     return searched_queries
 
 
-def enrich_new_courts(courts):
-    """Enrich courts that don't have details yet. Downloads photos too."""
-    photos_dir = REPO_ROOT / "docs" / "photos"
-    photos_dir.mkdir(exist_ok=True)
+async def fetch_details(client, pid):
+    """Fetch Place Details tagged with its place id (details is None on failure)."""
+    try:
+        return pid, await get_place_details(client, pid)
+    except REQUEST_ERRORS as e:
+        print(f"  ERROR enriching {pid}: {e}")
+        return pid, None
 
-    unenriched = [pid for pid, c in courts.items() if not is_enriched(c)]
-    to_enrich = unenriched[:MAX_NEW_ENRICHMENT]
 
-    if not to_enrich:
-        print("\nAll courts already enriched (or limit reached). No new Details calls needed.")
-        return
+async def save_court_photo(client, court, photos_dir, pool, log):
+    """Download a court's pending photo and log the updated court. Returns True if saved."""
+    photo_path = photos_dir / f"{court['place_id'].replace('/', '_')}.webp"
+    try:
+        await download_photo(client, court["photo_pending"], photo_path, pool)
+        court["photo"] = f"photos/{photo_path.name}"
+    except (*REQUEST_ERRORS, KeyError, OSError) as e:  # OSError: undecodable or truncated image
+        print(f"  Photo download failed for {court['place_id']}: {e}")
+    del court["photo_pending"]  # Settled either way; a failed photo isn't retried
+    append_enriched(log, court)
+    return court["photo"] is not None
+
+
+def photo_on_disk(photos_dir, pid):
+    """Relative path of a photo already saved for pid (WebP, or JPEG from older runs), or None."""
+    safe_id = pid.replace("/", "_")
+    for ext in (".webp", ".jpg"):
+        photo_path = photos_dir / f"{safe_id}{ext}"
+        if photo_path.exists() and photo_path.stat().st_size > 0:
+            return f"photos/{photo_path.name}"
+    return None
+
 
-    skipped = len(unenriched) - len(to_enrich)
-    print(f"\nEnriching {len(to_enrich)} new courts with Place Details + photos...")
-    if skipped > 0:
-        print(f"  ({skipped} more unenriched courts saved for next run)")
+def backfill_photos(courts, enriched_pids):
+    """Link photos already on disk to enriched courts whose record lost track of them.
 
-    photos_downloaded = 0
+    Returns the enriched courts whose photo download was still pending when a run stopped.
+    """
+    photos_dir = REPO_ROOT / "docs" / "photos"
+    linked = 0
+    pending = []
+    for pid in enriched_pids:
+        photo = None if courts[pid].get("photo") else photo_on_disk(photos_dir, pid)
+        if photo:
+            courts[pid]["photo"] = photo
+            courts[pid].pop("photo_pending", None)
+            linked += 1
+        elif courts[pid].get("photo_pending"):
+            pending.append(pid)
+    if linked:
+        print(f"Linked {linked} photos already on disk to enriched courts")
+    return pending
+
+
+async def enrich_new_courts(client, courts, enriched_pids, pool, pending_photos):
+    """Enrich courts that don't have details yet, adding them to enriched_pids.
+
+    Downloads photos too (plus any left pending by an interrupted run), transcoding
+    them to WebP on the process pool.
+    """
+    photos_dir = REPO_ROOT / "docs" / "photos"
+    photos_dir.mkdir(exist_ok=True)
 
-    for i, pid in enumerate(to_enrich):
+    # One pass: take candidates up to the limit, count the rest and the type rejects
+    to_enrich = []
+    not_courts = skipped = 0
+    for pid, court in courts.items():
+        if pid in enriched_pids:
+            continue
+        if not looks_like_court(court):
+            not_courts += 1
+        elif len(to_enrich) < MAX_NEW_ENRICHMENT:
+            to_enrich.append(pid)
+        else:
+            skipped += 1
+    if not_courts:
+        print(f"\n{not_courts} unenriched results skipped by type (not courts)")
+
+    if not to_enrich:
+        if not_courts and not skipped:
+            print("\nAll remaining unenriched results were filtered out as not courts. No new Details calls needed.")
+        else:
+            print("\nAll courts already enriched (or limit reached). No new Details calls needed.")
+        if not pending_photos:
+            return
+    else:
+        print(f"\nEnriching {len(to_enrich)} new courts with Place Details + photos...")
+        if skipped > 0:
+            print(f"  ({skipped} more unenriched courts saved for next run)")
+    if pending_photos:
+        print(f"Resuming {len(pending_photos)} photo downloads left pending by an interrupted run")
+
+    tasks = [asyncio.create_task(fetch_details(client, pid)) for pid in to_enrich]
+    photo_tasks = []
+    photos_reused = 0
+
+    enriched_path = REPO_ROOT / "data" / "enriched.jsonl"
+    with open(enriched_path, "ab") as log:
         try:
-            details = get_place_details(pid)
-            courts[pid]["rating"] = details.get("rating")
-            courts[pid]["user_rating_count"] = details.get("userRatingCount")
-            courts[pid]["phone"] = details.get("internationalPhoneNumber")
-            courts[pid]["website"] = details.get("websiteUri")
-            courts[pid]["hours"] = parse_hours(details.get("regularOpeningHours"))
-
-            # Download first photo if available
-            photos = details.get("photos", [])
-            if photos:
-                photo_name = photos[0].get("name")
-                if photo_name:
-                    safe_id = pid.replace("/", "_")
-                    photo_path = photos_dir / f"{safe_id}.jpg"
-                    try:
-                        download_photo(photo_name, photo_path)
-                        courts[pid]["photo"] = f"photos/{safe_id}.jpg"
-                        photos_downloaded += 1
-                    except requests.RequestException as e:
-                        print(f"  Photo download failed for {pid}: {e}")
-        except requests.RequestException as e:
-            print(f"  ERROR enriching {pid}: {e}")
-
-        if (i + 1) % 50 == 0:
-            print(f"  Enriched {i + 1}/{len(to_enrich)} ({photos_downloaded} photos)")
-            time.sleep(0.2)
+            photo_tasks.extend(
+                asyncio.create_task(save_court_photo(client, courts[pid], photos_dir, pool, log))
+                for pid in pending_photos
+            )
+            for i, task in enumerate(asyncio.as_completed(tasks)):
+                pid, details = await task
+                if details is not None:
+                    courts[pid]["rating"] = details.get("rating")
+                    courts[pid]["user_rating_count"] = details.get("userRatingCount")
+                    courts[pid]["phone"] = details.get("internationalPhoneNumber")
+                    courts[pid]["website"] = details.get("websiteUri")
+                    courts[pid]["hours"] = parse_hours(details.get("regularOpeningHours"))
+
+                    photos = details.get("photos", [])
+                    photo_name = photos[0].get("name") if photos else None
+                    saved_photo = photo_on_disk(photos_dir, pid) if photo_name else None
+                    if saved_photo:
+                        # Saved by an earlier run that stopped before the court was logged
+                        courts[pid]["photo"] = saved_photo
+                        photos_reused += 1
+                    elif photo_name:
+                        # Logged with the photo still pending, so a crash only costs the photo call
+                        courts[pid]["photo_pending"] = photo_name
+                    enriched_pids.add(pid)
+                    append_enriched(log, courts[pid])
+
+                    # Download the photo in the background so it doesn't hold up details
+                    if courts[pid].get("photo_pending"):
+                        photo_tasks.append(asyncio.create_task(
+                            save_court_photo(client, courts[pid], photos_dir, pool, log)
+                        ))
+
+                if (i + 1) % 50 == 0:
+                    print(f"  Enriched {i + 1}/{len(to_enrich)} ({len(photo_tasks)} photos queued)")
+
+            photos_downloaded = sum(await asyncio.gather(*photo_tasks))
+        finally:
+            # On a crash or Ctrl-C, stop outstanding requests before the client and log close
+            for t in tasks + photo_tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, *photo_tasks, return_exceptions=True)
 
     print(f"Enrichment complete. {len(to_enrich)} courts enriched, {photos_downloaded} photos downloaded.")
+    if photos_reused:
+        print(f"  ({photos_reused} photos already on disk, not re-downloaded)")
 
 
 def add_street_view_urls(courts):
-    """Add Street View links for all courts (free — just a URL, no API call)."""
+    """Backfill Street View links for courts saved before search results carried them."""
     added = 0
     for c in courts.values():
-        if c.get("lat") and c.get("lng") and not c.get("street_view_url"):
-            c["street_view_url"] = (
-                f"https://www.google.com/maps/@?api=1&map_action=pano"
-                f"&viewpoint={c['lat']},{c['lng']}"
-            )
+        url = None if c.get("street_view_url") else street_view_url(c.get("lat"), c.get("lng"))
+        if url:
+            c["street_view_url"] = url
             added += 1
     if added:
         print(f"\nAdded Street View URLs to {added} courts.")
 
 
-def main():
-    if not API_KEY or API_KEY == "paste_your_key_here":
-        print("ERROR: Set GOOGLE_API_KEY in .env (at repo root)")
-        sys.exit(1)
-
+async def main_async():
     data_dir = REPO_ROOT / "data"
     data_dir.mkdir(exist_ok=True)
 
     # Load existing state
-    searched_queries, courts = load_state()
+    searched_queries, courts, enriched_pids = load_state()
     print(f"Loaded {len(courts)} existing courts, {len(searched_queries)} previously searched queries")
-
-    # Phase 1: Search new cities/queries only
-    searched_queries = search_new_queries(searched_queries, courts)
-    save_checkpoint(searched_queries)
-
-    # Phase 2: Enrich new courts + download photos
-    enrich_new_courts(courts)
-
-    # Phase 3: Street View URLs (free)
+    pending_photos = backfill_photos(courts, enriched_pids)
+
+    async with httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        timeout=30,
+    ) as client:
+        # Phase 1: Search new cities/queries only
+        known_courts = len(courts)
+        searched_queries = await search_new_queries(client, searched_queries, courts)
+        if len(courts) > known_courts:
+            # Save new hits before their queries are marked searched, so a Phase 2 crash can't lose them
+            save_courts(list(courts.values()))
+        save_checkpoint(searched_queries, enriched_pids)
+
+        # Phase 2: Enrich new courts + download photos
+        # Spawn, not fork: forking after httpx has started threads can deadlock the workers
+        with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+            await enrich_new_courts(client, courts, enriched_pids, pool, pending_photos)
+        save_checkpoint(searched_queries, enriched_pids)
+
+    # Phase 3: Street View URLs for legacy courts (new ones get theirs at search time)
     add_street_view_urls(courts)
 
     # Save final output
     court_list = list(courts.values())
-    output_path = data_dir / "courts.json"
-    with open(output_path, "w") as f:
-        json.dump(court_list, f, indent=2)
+    output_path = save_courts(court_list)
     print(f"\nSaved {len(court_list)} courts to {output_path}")
+    (data_dir / "enriched.jsonl").unlink(missing_ok=True)  # Now folded into courts.jsonl.gz
 
     docs_path = REPO_ROOT / "docs" / "courts.json"
-    with open(docs_path, "w") as f:
-        json.dump(court_list, f, indent=2)
+    docs_path.write_bytes(orjson.dumps(court_list, option=orjson.OPT_INDENT_2))
     print(f"Copied to {docs_path} for GitHub Pages")
 
     # Summary
-    enriched_count = sum(1 for c in court_list if is_enriched(c))
+    enriched_count = len(enriched_pids)
     photo_count = sum(1 for c in court_list if c.get("photo"))
     print(f"\nTotal: {len(court_list)} courts | {enriched_count} enriched | {photo_count} with photos")
 
 
+def main():
+    if not API_KEY or API_KEY == "paste_your_key_here":
+        print("ERROR: Set GOOGLE_API_KEY in .env (at repo root)")
+        sys.exit(1)
+
+    asyncio.run(main_async())
+
+
 if __name__ == "__main__":
     main()